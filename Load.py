@@ -1,8 +1,12 @@
+import logging
 import numpy as np
 
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
 def generate_load_profile(num_prosumers: int, num_steps: int):
 
-    print(">>> NEW DOUBLE-PEAK LOAD PROFILE USED <<<")
+    logger.debug(">>> NEW DOUBLE-PEAK LOAD PROFILE USED <<<")
 
 
     hours = np.linspace(0, 24, num_steps, endpoint=False)
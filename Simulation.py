@@ -0,0 +1,358 @@
+from __future__ import annotations
+import argparse
+import logging
+from typing import List, Dict, Optional
+
+import numpy as np
+
+from PV_Generation import generate_PV_profile
+from Load import generate_load_profile
+from Price_Forecast import retailer_generate_price_profile
+from Agents import Prosumer
+from Market import match_trades, match_local_market
+from Regulator import Regulator
+
+# matplotlib and the blockchain are imported inside the functions that use them
+# so that importing this module (e.g. from batch workers) stays cheap
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())  # silent unless the application configures logging
+
+
+def run_simulation(
+    num_prosumers: int = 200,
+    num_steps: int = 24,
+    activate_regulator: bool = True,
+    regulator_objective: str = "maximize_p2p",
+    block_chain_difficulty: int = 3,
+    use_blockchain: bool = True,
+    # -------- Battery settings (community battery) --------
+    battery_capacity_kwh: float = 500.0,
+    battery_soc_init_kwh: float = 0.0,
+    battery_charge_eff: float = 0.95,
+    battery_discharge_eff: float = 0.95,
+) -> Dict:
+    """
+    Run the prosumer community simulation over num_steps time steps.
+
+    Each step: self-balance -> P2P market -> local market (aggregator) -> grid settlement,
+    then the regulator applies its rules and the step's trades are mined into a block.
+    If use_blockchain is False no block is mined and results["blockchain"] is None.
+
+    The community battery was removed from the project (the local market and the grid
+    already balance the community): the battery_* parameters are accepted but ignored,
+    and the battery_* history lists stay empty.
+
+    P2P_penetration_ratio is -1.0 for steps without community deficit (ratio undefined).
+
+    Returns a dict with "history" (per-step metrics), "blockchain" and "raw_data".
+    """
+
+    # ---------------- Initialization ----------------
+    prosumers: List[Prosumer] = []
+    for i in range(num_prosumers):
+        has_pv = (i < int(0.7 * num_prosumers))
+        prosumers.append(Prosumer(id=i, has_pv=has_pv))
+
+    pv, capacities = generate_PV_profile(num_prosumers, num_steps)
+    loads = generate_load_profile(num_prosumers, num_steps)
+    grid_price, fit_price = retailer_generate_price_profile(num_steps)
+
+    regulator = Regulator(objective=regulator_objective)
+
+    blockchain = None
+    if use_blockchain:
+        from BlockChain import Blockchain
+
+        blockchain = Blockchain(
+            difficulty=block_chain_difficulty,
+            miner_ids=list(range(10))
+        )
+
+    history = {
+        # system metrics
+        "total_load": [],
+        "total_pv": [],
+        "community_profit": [],
+        "p2p_share": [],
+        "P2P_penetration_ratio": [],
+        "objective_value": [],
+        "total_community_surplus": [],
+        "total_community_deficit": [],
+
+        # energy flows
+        "p2p_energy": [],
+        "local_energy": [],
+        "grid_import": [],
+        "grid_export": [],
+
+        # battery flows (always empty: the community battery is disabled)
+        "battery_soc": [],
+        "battery_charge": [],      # kWh absorbed from surplus (before eff)
+        "battery_discharge": [],   # kWh supplied to deficits (after eff)
+    }
+
+    # ---------------- Time loop ----------------
+    for t in range(num_steps):
+
+        asks, bids = [], []
+
+        imbalances = np.zeros(num_prosumers)
+        sold = np.zeros(num_prosumers)
+        bought = np.zeros(num_prosumers)
+
+        p2p_energy = 0.0
+        local_energy = 0.0
+        P2Pt_penetration_ratio = -1.0  # undefined when there is no deficit to cover
+
+        # ---- Step 1: Self-balance & build P2P offers ----
+        for i, p in enumerate(prosumers):
+
+            pv_t = pv[i, t] if p.has_pv else 0.0
+            load_t = loads[i, t]
+
+            imbalance = p.self_balance(load_t, pv_t)  # pv-load
+            imbalances[i] = imbalance
+
+            role, qty, price = p.decide_P2P_offer(
+                imbalance=imbalance,
+                grid_price_t=grid_price[t]
+            )
+
+            if role == "seller":
+                asks.append((p.id, qty, price))
+            elif role == "buyer":
+                bids.append((p.id, qty, price))
+
+        #  Computing total deficit/surplus for metrics (once all imbalances are known)
+        surplus_global = np.sum(imbalances[imbalances > 0])
+        deficit_global = np.sum(np.abs(imbalances[imbalances < 0]))
+
+        # ---- Step 2: P2P market ----
+        p2p_trades, rem_asks, rem_bids = match_trades(asks, bids)
+
+        for tr in p2p_trades:
+            s, b = tr["seller"], tr["buyer"]
+            q, pr = tr["quantity"], tr["price"]
+
+            prosumers[s].apply_trade_result("seller", q, pr)
+            prosumers[b].apply_trade_result("buyer", q, pr)
+
+            sold[s] += q
+            bought[b] += q
+            p2p_energy += q
+
+
+        # ---- Step 3: Local market (aggregator) ----
+
+        # Debugging local market
+        logger.debug("Left after P2P - Sellers: %d, Buyers: %d", len(rem_asks), len(rem_bids))
+
+        local_trades = match_local_market(rem_asks, rem_bids, grid_price[t])
+        aggregator_net_energy = 0.0
+
+        for tr in local_trades:
+            pid = tr["prosumer"]
+            q = tr["quantity"]
+            pr = tr["price"]
+
+            if tr["side"] == "sell":
+                # prosumer sells surplus to aggregator
+                prosumers[pid].apply_trade_result("seller", q, pr)
+                sold[pid] += q
+                local_energy += q
+                aggregator_net_energy += q
+
+            elif tr["side"] == "buy":
+                # prosumer buys from aggregator
+                prosumers[pid].apply_trade_result("buyer", q, pr)
+                bought[pid] += q
+                local_energy += q
+                aggregator_net_energy -= q
+
+        # ---- Remaining imbalance after markets ----
+        # (+) surplus, (-) deficit
+        remaining_vec = imbalances - sold + bought
+
+        # ---------------- Step 4: Grid settlement ----------------
+        grid_import, grid_export = 0.0, 0.0
+
+        for i, p in enumerate(prosumers):
+            remaining = float(remaining_vec[i])
+
+            gi, ge = p.retailer_settle_with_grid(
+                remaining_imbalance=remaining,
+                grid_price_t=grid_price[t],
+                fit_price=fit_price
+            )
+            grid_import += gi
+            grid_export += ge
+
+        # ---------------- Metrics ----------------
+        total_load = float(loads[:, t].sum())
+        total_pv = float(pv[:, t].sum())
+        community_profit = float(sum(p.money for p in prosumers))
+
+        if deficit_global > 1e-6:
+            P2Pt_penetration_ratio = p2p_energy / deficit_global
+        traded_total = p2p_energy + local_energy
+
+        # Indicator to delete: not used anymore
+        p2p_share = p2p_energy / (traded_total + 1e-6)
+
+
+        history["total_load"].append(total_load)
+        history["total_pv"].append(total_pv)
+        history["p2p_energy"].append(p2p_energy)
+        history["local_energy"].append(local_energy)
+        history["grid_import"].append(grid_import)
+        history["grid_export"].append(grid_export)
+        history["community_profit"].append(community_profit)
+        history["p2p_share"].append(p2p_share)
+        history["total_community_surplus"].append(surplus_global)
+        history["total_community_deficit"].append(deficit_global)
+        history["P2P_penetration_ratio"].append(P2Pt_penetration_ratio)
+
+        # ---- Regulator ----
+        obj_value = regulator.evaluate_objective({
+            #"p2p_share": p2p_share,
+            "P2P_penetration_ratio": P2Pt_penetration_ratio,
+            "community_profit": community_profit
+        })
+        history["objective_value"].append(obj_value)
+        if activate_regulator:
+            regulator.apply_rules(prosumers, surplus_global, deficit_global)
+
+        # ---- Blockchain ----
+        if blockchain is not None:
+            blockchain.mine_block(p2p_trades + local_trades)
+
+    return {
+        "history": history,
+        "blockchain": blockchain,
+        "raw_data": {
+            "pv": pv,
+            "loads": loads,
+            "grid_price": grid_price,
+            "fit_price": fit_price,
+            "capacities": capacities
+        }
+    }
+
+
+def summarize(history: Dict) -> Dict:
+    """
+    Aggregate the per-step history into the totals shown in the notebook summary.
+    """
+
+    penetration = [v for v in history["P2P_penetration_ratio"] if v >= 0]
+    return {
+        "total_load": float(sum(history["total_load"])),
+        "total_pv": float(sum(history["total_pv"])),
+        "total_community_surplus": float(sum(history["total_community_surplus"])),
+        "total_community_deficit": float(sum(history["total_community_deficit"])),
+        "total_p2p_energy": float(sum(history["p2p_energy"])),
+        "total_local_energy": float(sum(history["local_energy"])),
+        "total_grid_import": float(sum(history["grid_import"])),
+        "total_grid_export": float(sum(history["grid_export"])),
+        "final_community_profit": history["community_profit"][-1] if history["community_profit"] else 0.0,
+        "avg_P2P_penetration_ratio": float(np.mean(penetration)) if penetration else 0.0,
+    }
+
+
+def plot_results(history: Dict) -> None:
+    """
+    Plot PV vs load and the energy supply composition over time.
+    matplotlib is only imported here, so it is not needed to run the simulation itself.
+    """
+    import matplotlib.pyplot as plt
+
+    time = np.arange(len(history["total_load"]))
+
+    plt.figure()
+    plt.plot(history["total_pv"], label="Total PV generation")
+    plt.plot(history["total_load"], label="Total load")
+    plt.xlabel("Time step")
+    plt.ylabel("Energy (kWh)")
+    plt.title("Community PV generation vs Load")
+    plt.legend()
+    plt.grid(True)
+
+    plt.figure(figsize=(12, 6))
+    plt.stackplot(
+        time,
+        history["p2p_energy"],
+        history["local_energy"],
+        history["grid_import"],
+        labels=["P2P trading", "Local market (aggregator)", "Grid import"],
+        alpha=0.85
+    )
+    plt.xlabel("Time step (hour)")
+    plt.ylabel("Energy supplied (kWh)")
+    plt.title("Energy supply composition over time")
+    plt.legend(loc="upper left")
+    plt.grid(alpha=0.3)
+    plt.tight_layout()
+    plt.show()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point: python Simulation.py [options]
+    """
+
+    parser = argparse.ArgumentParser(description="Run the prosumer community simulation.")
+    parser.add_argument("--num-prosumers", type=int, default=200)
+    parser.add_argument("--num-steps", type=int, default=24)
+    parser.add_argument("--no-regulator", action="store_true", help="disable reward/punishment rules")
+    parser.add_argument("--objective", default="maximize_p2p", help="regulator objective")
+    parser.add_argument("--difficulty", type=int, default=3, help="blockchain proof-of-work difficulty")
+    parser.add_argument("--no-blockchain", action="store_true", help="skip mining the trades into blocks")
+    parser.add_argument("--seed", type=int, default=None, help="numpy random seed")
+    parser.add_argument("--plot", action="store_true", help="show plots (requires matplotlib)")
+    parser.add_argument("-v", "--verbose", action="count", default=0,
+                        help="-v for info, -vv for per-step debug logging")
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        logging.basicConfig(
+            level=logging.DEBUG if args.verbose > 1 else logging.INFO,
+            format="%(levelname)s %(name)s: %(message)s"
+        )
+
+    if args.seed is not None:
+        np.random.seed(args.seed)
+
+    results = run_simulation(
+        num_prosumers=args.num_prosumers,
+        num_steps=args.num_steps,
+        activate_regulator=not args.no_regulator,
+        regulator_objective=args.objective,
+        block_chain_difficulty=args.difficulty,
+        use_blockchain=not args.no_blockchain,
+    )
+
+    summary = summarize(results["history"])
+    print("===== SYSTEM SUMMARY =====")
+    print(f"Total load (kWh): {summary['total_load']:.1f}")
+    print(f"Total PV generation (kWh): {summary['total_pv']:.1f}")
+    print(f"Total surplus (kWh): {summary['total_community_surplus']:.1f}")
+    print(f"Total deficit (kWh): {summary['total_community_deficit']:.1f}")
+    print(f"Total P2P energy (kWh): {summary['total_p2p_energy']:.1f}")
+    print(f"Total Local market energy (kWh): {summary['total_local_energy']:.1f}")
+    print(f"Total Grid import (kWh): {summary['total_grid_import']:.1f}")
+    print(f"Total Grid export (kWh): {summary['total_grid_export']:.1f}")
+    print(f"Final community profit (€): {summary['final_community_profit']:.2f}")
+    print(f"Average P2P penetration ratio: {summary['avg_P2P_penetration_ratio']:.2f}")
+
+    if results["blockchain"] is not None:
+        logger.info("Blockchain: %s", results["blockchain"].summary())
+
+    if args.plot:
+        plot_results(results["history"])
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+import Simulation
+from Simulation import run_simulation, summarize, main
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# generous budget for a cold `import Simulation` (numpy included) on a slow CI machine
+IMPORT_BUDGET_S = 2.0
+
+
+def test_cold_import_is_lazy_and_fast():
+    code = (
+        "import sys, time\n"
+        "t0 = time.perf_counter()\n"
+        "import Simulation\n"
+        "elapsed = time.perf_counter() - t0\n"
+        "print(elapsed)\n"
+        "print(sorted(m for m in ('matplotlib', 'BlockChain') if m in sys.modules))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True, check=True
+    ).stdout.splitlines()
+
+    elapsed = float(out[0])
+    assert out[1] == "[]"  # neither plotting nor blockchain loaded on import
+    assert elapsed < IMPORT_BUDGET_S, f"cold import took {elapsed:.3f}s"
+
+
+def test_run_without_blockchain():
+    results = run_simulation(num_prosumers=10, num_steps=3, use_blockchain=False)
+
+    assert results["blockchain"] is None
+    for key in ("total_load", "p2p_energy", "grid_import", "P2P_penetration_ratio", "objective_value"):
+        assert len(results["history"][key]) == 3
+
+
+def test_default_run_is_silent(capsys):
+    # default logging and blockchain settings; fewer prosumers/steps only to keep mining quick
+    run_simulation(num_prosumers=20, num_steps=4)
+
+    captured = capsys.readouterr()
+    assert captured.out == ""
+
+
+def test_zero_deficit_step(monkeypatch):
+    # no load at all: every prosumer is in surplus (or balanced), so there is no deficit
+    monkeypatch.setattr(
+        Simulation, "generate_load_profile", lambda n, steps: np.zeros((n, steps))
+    )
+    results = run_simulation(num_prosumers=10, num_steps=3, use_blockchain=False)
+    history = results["history"]
+
+    assert history["total_community_deficit"] == [0.0, 0.0, 0.0]
+    assert history["P2P_penetration_ratio"] == [-1.0, -1.0, -1.0]
+    assert summarize(history)["avg_P2P_penetration_ratio"] == 0.0
+
+
+def test_no_prosumers():
+    results = run_simulation(num_prosumers=0, num_steps=2, use_blockchain=False)
+
+    assert results["history"]["P2P_penetration_ratio"] == [-1.0, -1.0]
+
+
+def test_main_cli(capsys):
+    assert main(["--num-prosumers", "5", "--num-steps", "2", "--no-blockchain"]) == 0
+    assert "SYSTEM SUMMARY" in capsys.readouterr().out